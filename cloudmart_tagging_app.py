@@ -2,6 +2,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import re
 from io import BytesIO, StringIO
 
 # Page configuration
@@ -22,74 +27,100 @@ if 'df_edited' not in st.session_state:
     st.session_state.df_edited = None
 if 'original_df' not in st.session_state:
     st.session_state.original_df = None
+    st.session_state.before_stats = None
+if 'file_id' not in st.session_state:
+    st.session_state.file_id = None
+    st.session_state.parsed_df = None
+if 'edit_version' not in st.session_state:
+    st.session_state.edit_version = 0
+    st.session_state.untagged_cache = None
 
-# Load data function with RIGHT-ALIGNED parsing (last 3 columns always have values)
+# Right-align short rows: the last 3 fields (CreatedBy, MonthlyCostUSD, Tagged) ALWAYS have values,
+# so insert the missing empty fields in front of them directly in the raw bytes.
+# Every row is also padded on the right to `width` fields, so the CSV reader sees a rectangular table.
+def pad_rows(buf, newlines, commas, field_counts, expected_cols, width):
+    row_starts = np.r_[0, newlines + 1]
+    row_ends = np.r_[newlines, len(buf)]
+    first_comma = np.r_[0, np.cumsum(field_counts - 1)[:-1]]
+    
+    # Gap goes before the first of a short row's last 3 fields (the row start if it has 3 or fewer)
+    short = np.flatnonzero(field_counts < expected_cols)
+    gap_field = np.maximum(field_counts[short] - 3, 0)
+    gap_pos = row_starts[short]
+    has_lead = gap_field > 0
+    gap_pos[has_lead] = commas[first_comma[short][has_lead] + gap_field[has_lead] - 1] + 1
+    
+    positions = np.concatenate([np.repeat(gap_pos, expected_cols - field_counts[short]),
+                                np.repeat(row_ends, width - np.maximum(field_counts, expected_cols))])
+    return np.insert(buf, positions, ord(',')) if len(positions) else buf
+
+# Parse CSV bytes with RIGHT-ALIGNED rows (last 3 columns always have values).
+# Cached on the file content, so identical uploads reuse the parsed frame
 @st.cache_data
-def load_data(file):
+def parse_csv(content):
     try:
-        # Read the file content
-        content = file.read()
-        
-        # Decode if bytes
-        if isinstance(content, bytes):
-            content = content.decode('utf-8')
-        
-        # Split into lines
-        lines = content.strip().split('\n')
+        # Remove quotes wrapping entire lines (e.g. "a,b,c")
+        content = re.sub(rb'^[ \t]*"(.*)"[ \t\r]*$', rb'\1', content.strip(), flags=re.MULTILINE)
         
         # Get header
-        header_line = lines[0].strip()
-        if header_line.startswith('"') and header_line.endswith('"'):
-            header_line = header_line[1:-1]
-        
-        headers = [h.strip() for h in header_line.split(',')]
+        header_line, _, body = content.partition(b'\n')
+        headers = [h.strip() for h in header_line.decode('utf-8').split(',')]
         expected_cols = len(headers)
         
-        # Process data rows with RIGHT-ALIGNMENT
-        # Last 3 columns (CreatedBy, MonthlyCostUSD, Tagged) ALWAYS have values
-        data_rows = []
-        for i, line in enumerate(lines[1:], start=1):
-            line = line.strip()
-            
-            # Remove surrounding quotes
-            if line.startswith('"') and line.endswith('"'):
-                line = line[1:-1]
-            
-            # Split by comma
-            fields = line.split(',')
-            
-            # If row has fewer fields than expected, RIGHT-ALIGN the last 3 columns
-            if len(fields) < expected_cols:
-                missing_count = expected_cols - len(fields)
-                
-                # Last 3 fields are always: CreatedBy, MonthlyCostUSD, Tagged
-                first_part = fields[:-3]  # Everything except last 3
-                last_three = fields[-3:]   # Last 3 fields that always have values
-                
-                # Insert empty fields in the middle (between first_part and last_three)
-                padding = [''] * missing_count
-                fields = first_part + padding + last_three
-            
-            # If row has more fields, truncate (shouldn't happen but just in case)
-            elif len(fields) > expected_cols:
-                fields = fields[:expected_cols]
-            
-            data_rows.append(fields)
+        if not body:
+            return pd.DataFrame(columns=headers)
         
-        # Create DataFrame
-        df = pd.DataFrame(data_rows, columns=headers)
+        # Count fields per data row so ragged rows can be RIGHT-ALIGNED before parsing:
+        # locate newlines and commas in the raw bytes, then tally commas per line
+        # (CRLF line endings are normalised first so row padding lands before the line break).
+        # Rows end at '\n' only, but pyarrow would also end one at a lone '\r', so any stray CR is swapped
+        # for a control byte the file doesn't otherwise contain and restored after parsing
+        body = body.replace(b'\r\n', b'\n')
+        stray_cr = None
+        if b'\r' in body:
+            stray_cr = next(chr(c) for c in [*range(9), *range(14, 32)] if bytes([c]) not in body)
+            body = body.replace(b'\r', stray_cr.encode())
+        buf = np.frombuffer(body, dtype=np.uint8)
+        newlines = np.flatnonzero(buf == ord('\n'))
+        commas = np.flatnonzero(buf == ord(','))
+        field_counts = np.bincount(np.searchsorted(newlines, commas), minlength=len(newlines) + 1) + 1
+        width = max(expected_cols, field_counts.max())
         
-        # Strip whitespace from all string columns
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].str.strip()
+        # If row has fewer fields than expected, RIGHT-ALIGN the last 3 columns
+        buf = pad_rows(buf, newlines, commas, field_counts, expected_cols, width)
         
-        # Replace empty strings with NaN for better handling
-        df.replace('', pd.NA, inplace=True)
+        # Parse every row as plain strings with pyarrow's multi-threaded CSV reader (no quoting, empty
+        # lines kept as rows); rows with more fields are truncated, shouldn't happen but just in case
+        column_names = [str(i) for i in range(width)]
+        table = pacsv.read_csv(
+            pa.py_buffer(buf),
+            read_options=pacsv.ReadOptions(column_names=column_names, use_threads=True),
+            parse_options=pacsv.ParseOptions(quote_char=False, ignore_empty_lines=False),
+            convert_options=pacsv.ConvertOptions(column_types=dict.fromkeys(column_names, pa.string()),
+                                                 strings_can_be_null=False)
+        )
+        
+        # Strip whitespace from all columns with Arrow's UTF-8 kernel and turn empty strings into
+        # missing values, then hand them to pandas as Arrow-backed strings (no per-cell Python objects).
+        # High-cardinality identifiers (ResourceID, AccountID) stay string[pyarrow]; the rest become categoricals below.
+        columns = []
+        for column in table.columns[:expected_cols]:
+            if stray_cr is not None:
+                column = pc.replace_substring(column, stray_cr, '\r')
+            trimmed = pc.utf8_trim_whitespace(column)
+            columns.append(pc.if_else(pc.equal(trimmed, ''), None, trimmed))
+        df = pa.Table.from_arrays(columns, names=headers).to_pandas(
+            types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
         
-        # Convert MonthlyCostUSD to numeric
+        # Convert MonthlyCostUSD to numeric. Kept as float64 on purpose: float32 only holds ~7 significant
+        # digits, which shifts dashboard totals by cents (e.g. $133,591.13 -> $133,591.12 on 300 rows)
         if 'MonthlyCostUSD' in df.columns:
-            df['MonthlyCostUSD'] = pd.to_numeric(df['MonthlyCostUSD'], errors='coerce')
+            df['MonthlyCostUSD'] = pd.to_numeric(df['MonthlyCostUSD'], errors='coerce').astype('float64')
+        
+        # Store low-cardinality text columns as categoricals (integer codes instead of Python strings)
+        for col in ['Service', 'Region', 'Department', 'Environment', 'Tagged', 'Project', 'Owner', 'CostCenter', 'CreatedBy']:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
         
         return df
         
@@ -100,9 +131,265 @@ def load_data(file):
         st.code(traceback.format_exc())
         return None
 
+# Load data function: hands the raw bytes to the cached parser
+def load_data(file):
+    return parse_csv(file.getvalue())
+
+# Build one boolean mask for the (column, value) filters, AND-ed in place on a single NumPy array.
+# Categorical columns are compared on their integer codes rather than their string values.
+def filter_mask(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for col, value in filters:
+        if value == 'All' or col not in df.columns:
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            categories = df[col].cat.categories
+            code = categories.get_loc(value) if value in categories else -2  # -2 matches no row
+            mask &= df[col].cat.codes.to_numpy() == code
+        else:
+            mask &= (df[col] == value).to_numpy(dtype=bool, na_value=False)
+    return mask
+
+# Dropdown choices for the sidebar filters, computed once per uploaded file
+@st.cache_data(show_spinner=False)
+def filter_options(_df, data_key):
+    options = {}
+    for col in ['Service', 'Region', 'Department', 'Environment']:
+        if col not in _df.columns:
+            continue
+        if isinstance(_df[col].dtype, pd.CategoricalDtype):
+            # Categories are already unique, sorted and free of missing values
+            values = _df[col].cat.categories.tolist()
+        else:
+            values = sorted(_df[col].dropna().unique().tolist())
+        options[col] = ['All'] + values
+    return options
+
+# Row positions matching the sidebar filters (None when every row matches) from a single combined
+# boolean mask, plus the filtered cost total so reruns don't rescan the cost column. Only these small
+# results are cached, never a copy of the frame, and old entries are evicted.
+# The DataFrame is not hashed (leading underscore); data_key identifies the uploaded file instead.
+@st.cache_data(show_spinner=False, max_entries=64)
+def filter_positions(_df, data_key, filters):
+    mask = filter_mask(_df, filters)
+    if mask.all():
+        return None, _df['MonthlyCostUSD'].sum()
+    positions = np.flatnonzero(mask)
+    return positions, _df['MonthlyCostUSD'].iloc[positions].sum()
+
+# Apply the sidebar filters by slicing the session's frame at the cached positions (no copy when unfiltered)
+def apply_filters(df, data_key, filters):
+    positions, filtered_cost = filter_positions(df, data_key, filters)
+    filtered_df = df if positions is None else df.take(positions)
+    return filtered_df, filtered_cost
+
+# Extend a categorical column's categories with any new values (kept sorted, as astype('category') does),
+# so edited tag values can be assigned into it. Non-categorical columns are returned unchanged
+def with_categories(series, values):
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    new_values = pd.Index(values).dropna().difference(series.cat.categories)
+    if len(new_values) == 0:
+        return series
+    return series.cat.set_categories(series.cat.categories.union(new_values))
+
+# Cost and resource count per (Department, Tagged) pair, with Tagged values as columns ('sum' and 'size' blocks).
+# Two bincounts over the combined categorical codes; missing values are kept as their own (last) group
+# so untagged totals still add up. Only observed departments and Tagged values are returned.
+# Without a Department column every row falls into that missing-department group (a Tagged-only summary)
+def tagging_summary(df):
+    if 'Department' in df.columns:
+        depts = df['Department'].cat.categories
+        dept_codes = df['Department'].cat.codes.to_numpy()
+    else:
+        depts = pd.Index([])
+        dept_codes = np.full(len(df), -1)
+    tags = df['Tagged'].cat.categories
+    tag_codes = df['Tagged'].cat.codes.to_numpy()
+    dept_codes = np.where(dept_codes < 0, len(depts), dept_codes)
+    tag_codes = np.where(tag_codes < 0, len(tags), tag_codes)
+    
+    shape = (len(depts) + 1, len(tags) + 1)
+    pair_codes = dept_codes * shape[1] + tag_codes
+    costs = np.nan_to_num(df['MonthlyCostUSD'].to_numpy())
+    cost = np.bincount(pair_codes, weights=costs, minlength=shape[0] * shape[1]).reshape(shape)
+    size = np.bincount(pair_codes, minlength=shape[0] * shape[1]).reshape(shape)
+    
+    rows = size.sum(axis=1) > 0
+    cols = size.sum(axis=0) > 0
+    index = pd.Index(depts.tolist() + [np.nan], name='Department')[rows]
+    columns = pd.Index(tags.tolist() + [np.nan], name='Tagged')[cols]
+    return pd.concat({'sum': pd.DataFrame(cost[rows][:, cols], index=index, columns=columns),
+                      'size': pd.DataFrame(size[rows][:, cols], index=index, columns=columns)}, axis=1)
+
+# Untagged rows of the remediation frame that match the sidebar filters, selected with one fused mask
+# (Tagged == 'No' is just one more filter). text_columns are converted to plain text for the editor here,
+# so the only copy is the one made when the key changes. data_key pairs the file id with the applied-edits
+# version, so each Apply invalidates the result. Kept as a single entry in this session's state rather than
+# st.cache_data, so results neither pile up across sessions and edit versions nor get unpickled on every rerun
+def filter_untagged(df, data_key, filters, text_columns=()):
+    key = (data_key, filters, text_columns)
+    if st.session_state.untagged_cache is None or st.session_state.untagged_cache[0] != key:
+        untagged_df = df[filter_mask(df, filters + (('Tagged', 'No'),))]
+        st.session_state.untagged_cache = (key, untagged_df.astype(dict.fromkeys(text_columns, 'object'), copy=False))
+    return st.session_state.untagged_cache[1]
+
+# Missing-value counts and cost aggregates shared by Tasks 1-4, computed once per filter selection
+# (capped like filter_positions)
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_aggregates(_df, data_key, filters):
+    # Cost per service as a weighted bincount over the categorical codes (no string hashing)
+    services = _df['Service'].cat.categories
+    codes = _df['Service'].cat.codes.to_numpy()
+    present = codes >= 0
+    service_totals = np.bincount(codes[present], weights=np.nan_to_num(_df['MonthlyCostUSD'].to_numpy()[present]),
+                                 minlength=len(services))
+    observed = np.bincount(codes[present], minlength=len(services)) > 0
+    
+    aggregates = {
+        'na_counts': _df.isna().sum(),
+        'by_tagged': _df.groupby('Tagged', observed=True)['MonthlyCostUSD'].sum(),
+        'by_service': pd.Series(service_totals[observed], index=pd.Index(services[observed], name='Service'),
+                                name='MonthlyCostUSD'),
+    }
+    if 'Department' in _df.columns:
+        aggregates['by_dept_tagged'] = _df.groupby(['Department', 'Tagged'], observed=True)['MonthlyCostUSD'].sum()
+    if 'Project' in _df.columns:
+        aggregates['by_project'] = _df.groupby('Project', observed=True)['MonthlyCostUSD'].sum()
+    if 'Environment' in _df.columns:
+        aggregates['by_env_tagged'] = _df.groupby(['Environment', 'Tagged'], observed=True)['MonthlyCostUSD'].sum()
+        aggregates['by_env'] = _df.groupby('Environment', observed=True).agg({'MonthlyCostUSD': 'sum', 'ResourceID': 'count'})
+    return aggregates
+
+# Positions of the k smallest values with an O(N) partition instead of a full sort.
+# Ties keep first-occurrence order, so the rows match Series.nsmallest(k)
+def smallest_positions(values, k):
+    k = min(k, len(values))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    threshold = np.partition(values, k - 1)[k - 1]
+    below = np.flatnonzero(values < threshold)
+    ties = np.flatnonzero(values == threshold)[:k - len(below)]
+    positions = np.concatenate([below, ties])
+    return positions[np.argsort(values[positions], kind='stable')]
+
+# Horizontal bar chart of cost per service, built straight from the aggregate's arrays.
+# Kept as a shared resource so reruns with the same totals reuse the figure; capped like filter_positions,
+# since every filter selection can produce new totals
+@st.cache_resource(show_spinner=False, max_entries=64)
+def service_cost_figure(service_cost):
+    costs = service_cost.to_numpy()
+    fig = go.Figure(go.Bar(
+        x=costs, y=service_cost.index.to_numpy(), orientation='h',
+        marker=dict(color=costs, colorscale='Viridis', showscale=True,
+                    colorbar=dict(title='Monthly Cost (USD)')),
+        hovertemplate='Service=%{y}<br>Monthly Cost (USD)=%{x}<extra></extra>'
+    ))
+    fig.update_layout(title='Total Cost by Service Type',
+                      xaxis_title='Monthly Cost (USD)', yaxis_title='Service')
+    return fig
+
+# Grouped Before/After bar for one remediation metric, rebuilt only when the two values change.
+# Every Apply produces new values, so this and the other Task 5 figure caches below are capped
+@st.cache_resource(show_spinner=False, max_entries=16)
+def impact_bar_figure(label, before, after, title, yaxis_title):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Before', x=[label], 
+                         y=[before], marker_color='#dc3545'))
+    fig.add_trace(go.Bar(name='After', x=[label], 
+                         y=[after], marker_color='#28a745'))
+    fig.update_layout(title=title, 
+                     yaxis_title=yaxis_title, barmode='group')
+    return fig
+
+# Tagged vs untagged donut chart, keyed on the two counts
+@st.cache_resource(show_spinner=False, max_entries=16)
+def progress_pie_figure(title, tagged, untagged):
+    progress_data = pd.DataFrame({'Status': ['Tagged', 'Untagged'], 'Count': [tagged, untagged]})
+    fig = px.pie(progress_data, 
+                values='Count', names='Status',
+                title=title,
+                color='Status',
+                color_discrete_map={'Tagged': '#28a745', 'Untagged': '#dc3545'},
+                hole=0.4)
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+# Static best-practices scatter. Module-level constants would be rebuilt on every rerun (Streamlit
+# re-executes the script), so the figure is built once per process as a shared resource instead
+@st.cache_resource(show_spinner=False)
+def best_practices_figure():
+    best_practices = pd.DataFrame({
+        'Practice': [
+            'Automated Tagging',
+            'Tag Policies',
+            'Regular Audits',
+            'Owner Training',
+            'CI/CD Integration'
+        ],
+        'Impact': [95, 90, 85, 80, 92],
+        'Effort': [60, 40, 30, 20, 70],
+        'Category': ['Automation', 'Policy', 'Process', 'People', 'Automation']
+    })
+    
+    fig = px.scatter(best_practices, x='Effort', y='Impact', size='Impact',
+                    color='Category', text='Practice',
+                    title='Best Practices: Impact vs Implementation Effort',
+                    labels={'Impact': 'Effectiveness (%)', 'Effort': 'Implementation Effort (%)'},
+                    color_discrete_sequence=px.colors.qualitative.Set2)
+    fig.update_traces(textposition='top center')
+    fig.update_layout(showlegend=True)
+    return fig
+
+# Cumulative net benefit over the first year, keyed on the two ROI inputs
+@st.cache_resource(show_spinner=False, max_entries=16)
+def roi_figure(monthly_savings, remediation_cost):
+    months = np.arange(0, 13)
+    cumulative_savings = monthly_savings * months - remediation_cost
+    
+    roi_df = pd.DataFrame({
+        'Month': months,
+        'Net Benefit': cumulative_savings
+    })
+    
+    fig = px.line(roi_df, x='Month', y='Net Benefit',
+                 title='Cumulative ROI from Tag Remediation',
+                 markers=True)
+    fig.add_hline(y=0, line_dash="dash", line_color="red", 
+                 annotation_text="Break-even")
+    fig.update_layout(yaxis_title='Cumulative Net Benefit ($)')
+    return fig
+
+# Serialize a DataFrame to CSV once per data_key; download buttons are rebuilt on every rerun.
+# The frame is not hashed (Streamlit only samples large frames, which would serve stale bytes after edits);
+# data_key must change whenever the frame's content does. Entries are capped, since every Apply adds new keys
+@st.cache_data(show_spinner=False, max_entries=16)
+def to_csv_bytes(_df, data_key):
+    csv_buffer = BytesIO()
+    _df.to_csv(csv_buffer, index=False)
+    return csv_buffer.getvalue()
+
+# Same for Parquet (columnar, zstd-compressed): smaller and faster to write than CSV, and keeps the dtypes
+@st.cache_data(show_spinner=False, max_entries=16)
+def to_parquet_bytes(_df, data_key):
+    parquet_buffer = BytesIO()
+    _df.to_parquet(parquet_buffer, engine='pyarrow', compression='zstd', index=False)
+    return parquet_buffer.getvalue()
+
 # Main application logic
 if uploaded_file is not None:
-    df = load_data(uploaded_file)
+    # Parse once per upload and keep the frame in session state, so reruns skip hashing the file
+    if st.session_state.file_id == uploaded_file.file_id:
+        df = st.session_state.parsed_df
+    else:
+        df = load_data(uploaded_file)
+        if df is not None:
+            st.session_state.file_id = uploaded_file.file_id
+            st.session_state.parsed_df = df
+            # A new file starts a fresh remediation session
+            st.session_state.original_df = None
+            st.session_state.before_stats = None
+            st.session_state.df_edited = None
     
     if df is not None and not df.empty:
         # Store original dataframe
@@ -136,28 +423,26 @@ if uploaded_file is not None:
         st.sidebar.title("🔍 Global Filters")
         st.sidebar.info("These filters apply to all task sets")
         
+        options = filter_options(df, uploaded_file.file_id)
+        
         # Service Filter
-        services = ['All'] + sorted(df['Service'].unique().tolist())
-        selected_service = st.sidebar.selectbox("Filter by Service", services, key='service_filter')
+        selected_service = st.sidebar.selectbox("Filter by Service", options['Service'], key='service_filter')
         
         # Region Filter
         if 'Region' in df.columns:
-            regions = ['All'] + sorted(df['Region'].unique().tolist())
-            selected_region = st.sidebar.selectbox("Filter by Region", regions, key='region_filter')
+            selected_region = st.sidebar.selectbox("Filter by Region", options['Region'], key='region_filter')
         else:
             selected_region = 'All'
         
         # Department Filter
         if 'Department' in df.columns:
-            departments = ['All'] + sorted(df['Department'].dropna().unique().tolist())
-            selected_department = st.sidebar.selectbox("Filter by Department", departments, key='department_filter')
+            selected_department = st.sidebar.selectbox("Filter by Department", options['Department'], key='department_filter')
         else:
             selected_department = 'All'
         
         # Environment Filter
         if 'Environment' in df.columns:
-            environments = ['All'] + sorted(df['Environment'].dropna().unique().tolist())
-            selected_environment = st.sidebar.selectbox("Filter by Environment", environments, key='environment_filter')
+            selected_environment = st.sidebar.selectbox("Filter by Environment", options['Environment'], key='environment_filter')
         else:
             selected_environment = 'All'
         
@@ -166,27 +451,19 @@ if uploaded_file is not None:
         selected_tagged = st.sidebar.selectbox("Filter by Tagged Status", tagged_options, key='tagged_filter')
         
         # Apply Filters
-        filtered_df = df.copy()
-        
-        if selected_service != 'All':
-            filtered_df = filtered_df[filtered_df['Service'] == selected_service]
-        
-        if selected_region != 'All' and 'Region' in df.columns:
-            filtered_df = filtered_df[filtered_df['Region'] == selected_region]
-        
-        if selected_department != 'All' and 'Department' in df.columns:
-            filtered_df = filtered_df[filtered_df['Department'] == selected_department]
-        
-        if selected_environment != 'All' and 'Environment' in df.columns:
-            filtered_df = filtered_df[filtered_df['Environment'] == selected_environment]
-        
-        if selected_tagged != 'All':
-            filtered_df = filtered_df[filtered_df['Tagged'] == selected_tagged]
+        filters = (
+            ('Service', selected_service),
+            ('Region', selected_region),
+            ('Department', selected_department),
+            ('Environment', selected_environment),
+            ('Tagged', selected_tagged),
+        )
+        filtered_df, filtered_cost = apply_filters(df, uploaded_file.file_id, filters)
         
         # Display filter summary
         st.sidebar.markdown("---")
         st.sidebar.metric("Filtered Resources", len(filtered_df))
-        st.sidebar.metric("Filtered Cost", f"${filtered_df['MonthlyCostUSD'].sum():,.2f}")
+        st.sidebar.metric("Filtered Cost", f"${filtered_cost:,.2f}")
         
         # Reset filters button
         if st.sidebar.button("🔄 Reset All Filters"):
@@ -203,8 +480,7 @@ if uploaded_file is not None:
             with col1:
                 st.metric("Total Resources", len(filtered_df))
             with col2:
-                total_cost = filtered_df['MonthlyCostUSD'].sum()
-                st.metric("Total Monthly Cost", f"${total_cost:,.2f}")
+                st.metric("Total Monthly Cost", f"${filtered_cost:,.2f}")
             with col3:
                 tagged_pct = (filtered_df['Tagged'].value_counts().get('Yes', 0) / len(filtered_df)) * 100 if len(filtered_df) > 0 else 0
                 st.metric("Tagged Resources", f"{tagged_pct:.1f}%")
@@ -235,6 +511,8 @@ if uploaded_file is not None:
         elif task_set == "Task 1: Data Exploration":
             st.header("🔍 Task Set 1: Data Exploration")
             
+            aggregates = compute_aggregates(filtered_df, uploaded_file.file_id, filters)
+            
             # Task 1.1: Display first 5 rows
             st.subheader("Task 1.1: Display First 5 Rows")
             st.info("💡 Hint: Use pd.read_csv() or upload via Streamlit")
@@ -246,7 +524,7 @@ if uploaded_file is not None:
             st.subheader("Task 1.2: Count Missing Values")
             st.info("💡 Hint: Use df.isnull().sum()")
             
-            missing_values = filtered_df.isnull().sum()
+            missing_values = aggregates['na_counts']
             missing_df = pd.DataFrame({
                 'Column': missing_values.index,
                 'Missing Count': missing_values.values,
@@ -282,6 +560,7 @@ if uploaded_file is not None:
             st.info("💡 Hint: Use df['Tagged'].value_counts()")
             
             tagged_counts = filtered_df['Tagged'].value_counts()
+            tagged_counts = tagged_counts[tagged_counts > 0]
             total_resources = len(filtered_df)
             untagged_count = tagged_counts.get('No', 0)
             tagged_count = tagged_counts.get('Yes', 0)
@@ -318,12 +597,14 @@ if uploaded_file is not None:
         elif task_set == "Task 2: Cost Visibility":
             st.header("💰 Task Set 2: Cost Visibility")
             
+            aggregates = compute_aggregates(filtered_df, uploaded_file.file_id, filters)
+            
             # Task 2.1: Calculate total cost by tagging status
             st.subheader("Task 2.1: Total Cost by Tagging Status")
             st.info("💡 Hint: Group by 'Tagged' and sum 'MonthlyCostUSD'")
             
-            cost_by_tagged = filtered_df.groupby('Tagged')['MonthlyCostUSD'].sum()
-            total_cost = filtered_df['MonthlyCostUSD'].sum()
+            cost_by_tagged = aggregates['by_tagged']
+            total_cost = filtered_cost
             untagged_cost = cost_by_tagged.get('No', 0)
             tagged_cost = cost_by_tagged.get('Yes', 0)
             
@@ -364,7 +645,8 @@ if uploaded_file is not None:
             st.info("💡 Hint: Filter by Tagged=='No' and group by 'Department'")
             
             if 'Department' in filtered_df.columns:
-                dept_cost = filtered_df[filtered_df['Tagged'] == 'No'].groupby('Department')['MonthlyCostUSD'].sum().sort_values(ascending=False)
+                dept_tagged = aggregates['by_dept_tagged']
+                dept_cost = dept_tagged[dept_tagged.index.get_level_values('Tagged') == 'No'].droplevel('Tagged').sort_values(ascending=False)
                 
                 if not dept_cost.empty:
                     st.dataframe(dept_cost.reset_index().rename(columns={'MonthlyCostUSD': 'Untagged Cost (USD)'}), 
@@ -389,7 +671,7 @@ if uploaded_file is not None:
             st.info("💡 Hint: Use .groupby('Project')['MonthlyCostUSD'].sum()")
             
             if 'Project' in filtered_df.columns:
-                project_cost = filtered_df.groupby('Project')['MonthlyCostUSD'].sum().sort_values(ascending=False)
+                project_cost = aggregates['by_project'].sort_values(ascending=False)
                 
                 if not project_cost.empty:
                     st.dataframe(project_cost.reset_index().rename(columns={'MonthlyCostUSD': 'Total Cost (USD)'}),
@@ -413,7 +695,7 @@ if uploaded_file is not None:
             
             if 'Environment' in filtered_df.columns:
                 # Grouped analysis
-                env_analysis = filtered_df.groupby(['Environment', 'Tagged'])['MonthlyCostUSD'].sum().reset_index()
+                env_analysis = aggregates['by_env_tagged'].reset_index()
                 
                 fig = px.bar(env_analysis, x='Environment', y='MonthlyCostUSD',
                              color='Tagged', barmode='group',
@@ -423,10 +705,7 @@ if uploaded_file is not None:
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Summary table
-                env_summary = filtered_df.groupby('Environment').agg({
-                    'MonthlyCostUSD': 'sum',
-                    'ResourceID': 'count'
-                }).round(2)
+                env_summary = aggregates['by_env'].round(2)
                 env_summary.columns = ['Total Cost (USD)', 'Resource Count']
                 st.dataframe(env_summary, use_container_width=True)
             else:
@@ -438,6 +717,8 @@ if uploaded_file is not None:
         elif task_set == "Task 3: Tagging Compliance":
             st.header("✅ Task Set 3: Tagging Compliance")
             
+            aggregates = compute_aggregates(filtered_df, uploaded_file.file_id, filters)
+            
             tag_fields = ['Department', 'Project', 'Environment', 'Owner', 'CostCenter']
             existing_tag_fields = [field for field in tag_fields if field in filtered_df.columns]
             
@@ -445,12 +726,19 @@ if uploaded_file is not None:
             st.subheader("Task 3.1: Create Tag Completeness Score")
             st.info("💡 Hint: Count how many of the tag fields are non-empty")
             
-            df_copy = filtered_df.copy()
-            df_copy['TagCompletenessScore'] = df_copy[existing_tag_fields].notna().sum(axis=1)
-            df_copy['CompletenessPercentage'] = (df_copy['TagCompletenessScore'] / len(existing_tag_fields)) * 100
-            
-            st.dataframe(df_copy[['ResourceID', 'Service', 'TagCompletenessScore', 
-                                  'CompletenessPercentage', 'MonthlyCostUSD']].head(10),
+            # Scores are standalone Series; only the displayed rows get materialized as frames
+            tag_present = np.empty((len(filtered_df), len(existing_tag_fields)), dtype=bool)
+            for i, field in enumerate(existing_tag_fields):
+                tag_present[:, i] = filtered_df[field].notna().to_numpy()
+            completeness_score = pd.Series(np.count_nonzero(tag_present, axis=1).astype(np.int8),
+                                           index=filtered_df.index)
+            completeness_pct = (completeness_score / len(existing_tag_fields)) * 100
+            
+            preview = filtered_df.head(10)
+            st.dataframe(preview[['ResourceID', 'Service']].assign(
+                            TagCompletenessScore=completeness_score.head(10),
+                            CompletenessPercentage=completeness_pct.head(10),
+                            MonthlyCostUSD=preview['MonthlyCostUSD']),
                         use_container_width=True)
             
             st.markdown("---")
@@ -461,9 +749,11 @@ if uploaded_file is not None:
             
             display_columns = ['ResourceID', 'Service'] + existing_tag_fields + ['TagCompletenessScore', 'CompletenessPercentage', 'MonthlyCostUSD']
             
-            lowest_completeness = df_copy.nsmallest(5, 'TagCompletenessScore')[
-                [col for col in display_columns if col in df_copy.columns]
-            ]
+            lowest = filtered_df.index[smallest_positions(completeness_score.to_numpy(), 5)]
+            lowest_completeness = filtered_df.loc[lowest].assign(
+                TagCompletenessScore=completeness_score[lowest],
+                CompletenessPercentage=completeness_pct[lowest]
+            )[display_columns]
             st.dataframe(lowest_completeness, use_container_width=True)
             
             st.markdown("---")
@@ -472,7 +762,7 @@ if uploaded_file is not None:
             st.subheader("Task 3.3: Most Frequently Missing Tag Fields")
             st.info("💡 Hint: Count missing entries per tag column")
             
-            missing_tags = filtered_df[existing_tag_fields].isnull().sum().sort_values(ascending=False)
+            missing_tags = aggregates['na_counts'][existing_tag_fields].sort_values(ascending=False)
             missing_tags_df = pd.DataFrame({
                 'Tag Field': missing_tags.index,
                 'Missing Count': missing_tags.values,
@@ -515,13 +805,9 @@ if uploaded_file is not None:
             st.subheader("Task 3.5: Export Untagged Resources to CSV")
             st.info("💡 Hint: Use df[df['Tagged']=='No'].to_csv('untagged.csv')")
             
-            csv_buffer = BytesIO()
-            untagged_resources.to_csv(csv_buffer, index=False)
-            csv_buffer.seek(0)
-            
             st.download_button(
                 label="📥 Download Untagged Resources CSV",
-                data=csv_buffer,
+                data=to_csv_bytes(untagged_resources, ('untagged', uploaded_file.file_id, filters)),
                 file_name="untagged_resources.csv",
                 mime="text/csv"
             )
@@ -532,11 +818,14 @@ if uploaded_file is not None:
         elif task_set == "Task 4: Visualization Dashboard":
             st.header("📊 Task Set 4: Visualization Dashboard")
             
+            aggregates = compute_aggregates(filtered_df, uploaded_file.file_id, filters)
+            
             # Task 4.1: Pie chart
             st.subheader("Task 4.1: Pie Chart - Tagged vs Untagged")
             st.info("💡 Hint: Use plotly.express.pie")
             
-            tagged_counts = filtered_df['Tagged'].value_counts().reset_index()
+            tagged_counts = filtered_df['Tagged'].value_counts()
+            tagged_counts = tagged_counts[tagged_counts > 0].reset_index()
             tagged_counts.columns = ['Tagged', 'Count']
             
             if len(tagged_counts) > 0:
@@ -555,7 +844,7 @@ if uploaded_file is not None:
             st.info("💡 Hint: Use barmode='group'")
             
             if 'Department' in filtered_df.columns:
-                dept_cost_tagged = filtered_df.groupby(['Department', 'Tagged'])['MonthlyCostUSD'].sum().reset_index()
+                dept_cost_tagged = aggregates['by_dept_tagged'].reset_index()
                 
                 if len(dept_cost_tagged) > 0:
                     fig = px.bar(dept_cost_tagged, x='Department', y='MonthlyCostUSD',
@@ -575,16 +864,10 @@ if uploaded_file is not None:
             st.subheader("Task 4.3: Horizontal Bar Chart - Total Cost per Service")
             st.info("💡 Hint: Group by 'Service' and use orientation='h'")
             
-            service_cost = filtered_df.groupby('Service')['MonthlyCostUSD'].sum().sort_values().reset_index()
+            service_cost = aggregates['by_service'].sort_values()
             
             if len(service_cost) > 0:
-                fig = px.bar(service_cost, y='Service', x='MonthlyCostUSD',
-                             orientation='h',
-                             title='Total Cost by Service Type',
-                             labels={'MonthlyCostUSD': 'Monthly Cost (USD)'},
-                             color='MonthlyCostUSD',
-                             color_continuous_scale='Viridis')
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(service_cost_figure(service_cost), use_container_width=True)
             else:
                 st.info("No data to display")
             
@@ -595,7 +878,7 @@ if uploaded_file is not None:
             st.info("💡 Hint: Pie or bar chart works")
             
             if 'Environment' in filtered_df.columns:
-                env_cost = filtered_df.groupby('Environment')['MonthlyCostUSD'].sum().reset_index()
+                env_cost = aggregates['by_env']['MonthlyCostUSD'].reset_index()
                 
                 if len(env_cost) > 0:
                     col1, col2 = st.columns(2)
@@ -629,37 +912,46 @@ if uploaded_file is not None:
         elif task_set == "Task 5: Tag Remediation":
             st.header("🔧 Task Set 5: Tag Remediation Workflow")
             
-            # Initialize edited dataframe
+            # Initialize edited dataframe (stays categorical; new tag values are added as categories on Apply)
             if st.session_state.df_edited is None:
                 st.session_state.df_edited = df.copy()
             
+            # Tag fields present in this upload (any of them may be missing from the CSV)
+            tag_fields = [col for col in ['Department', 'Project', 'Owner'] if col in df.columns]
+            
+            # Before-remediation metrics only depend on the unchanging original frame: compute them once per upload
+            if st.session_state.before_stats is None:
+                before_summary = tagging_summary(st.session_state.original_df)
+                st.session_state.before_stats = {
+                    'summary': before_summary,
+                    'tagged_count': before_summary['size'].sum(),
+                    'untagged_cost': before_summary['sum'].sum().get('No', 0),
+                    'total': len(st.session_state.original_df),
+                    'notna': st.session_state.original_df[tag_fields].notna().sum(),
+                }
+            before_stats = st.session_state.before_stats
+            
             # Task 5.1: Display editable table
             st.subheader("Task 5.1: Display Editable Table for Untagged Resources")
             st.info("💡 Hint: Use st.data_editor")
             
             st.markdown("💡 **Tip:** Double-click on any cell to edit. Fill in missing Department, Project, and Owner fields.")
             
-            # Get untagged resources (apply filters to edited dataframe)
-            untagged_mask = st.session_state.df_edited['Tagged'] == 'No'
-            untagged_df_full = st.session_state.df_edited[untagged_mask].copy()
-            
-            # Apply same filters as sidebar
-            untagged_df = untagged_df_full.copy()
-            if selected_service != 'All':
-                untagged_df = untagged_df[untagged_df['Service'] == selected_service]
-            if selected_region != 'All' and 'Region' in untagged_df.columns:
-                untagged_df = untagged_df[untagged_df['Region'] == selected_region]
-            if selected_department != 'All' and 'Department' in untagged_df.columns:
-                untagged_df = untagged_df[untagged_df['Department'] == selected_department]
-            if selected_environment != 'All' and 'Environment' in untagged_df.columns:
-                untagged_df = untagged_df[untagged_df['Environment'] == selected_environment]
+            # Determine which columns to make editable
+            disabled_columns = ['AccountID', 'ResourceID', 'Service', 'Region', 'MonthlyCostUSD', 'CreatedBy', 'Tagged']
+            
+            # Editable categorical columns are shown as plain text so any tag value can be entered
+            text_columns = tuple(col for col, dtype in st.session_state.df_edited.dtypes.items()
+                                 if isinstance(dtype, pd.CategoricalDtype) and col not in disabled_columns)
+            
+            # Get untagged resources (apply same filters as sidebar, except Tagged, to edited dataframe)
+            untagged_df = filter_untagged(st.session_state.df_edited,
+                                          (uploaded_file.file_id, st.session_state.edit_version),
+                                          filters[:4], text_columns)
             
             if len(untagged_df) > 0:
                 st.info(f"Found {len(untagged_df)} untagged resources to remediate")
                 
-                # Determine which columns to make editable
-                disabled_columns = ['AccountID', 'ResourceID', 'Service', 'Region', 'MonthlyCostUSD', 'CreatedBy', 'Tagged']
-                
                 # Display editable table - CAPTURE THE EDITED DATA
                 edited_data = st.data_editor(
                     untagged_df,
@@ -685,22 +977,28 @@ if uploaded_file is not None:
             
             if edited_data is not None and len(edited_data) > 0:
                 if st.button("✅ Apply Changes and Update Tagged Status", type="primary"):
-                    # Update the main dataframe with edited data
-                    changes_made = 0
-                    for idx, row in edited_data.iterrows():
-                        # Check if all important fields are filled
-                        has_dept = pd.notna(row.get('Department', None)) if 'Department' in row else True
-                        has_project = pd.notna(row.get('Project', None)) if 'Project' in row else True
-                        has_owner = pd.notna(row.get('Owner', None)) if 'Owner' in row else True
-                        
-                        # Update all fields first
-                        for col in edited_data.columns:
-                            st.session_state.df_edited.at[idx, col] = row[col]
-                        
-                        # Then check if should be marked as tagged
-                        if has_dept and has_project and has_owner:
-                            st.session_state.df_edited.at[idx, 'Tagged'] = 'Yes'
-                            changes_made += 1
+                    # Update the main dataframe with edited data in one aligned assignment
+                    # (not DataFrame.update, which would skip cells the user cleared).
+                    # Only editable columns are written back; disabled ones can't have changed
+                    df_edited = st.session_state.df_edited
+                    editable_columns = [col for col in edited_data.columns if col not in disabled_columns]
+                    for col in editable_columns:
+                        df_edited[col] = with_categories(df_edited[col], edited_data[col])
+                    df_edited['Tagged'] = with_categories(df_edited['Tagged'], ['Yes'])
+                    df_edited.loc[edited_data.index, editable_columns] = edited_data[editable_columns]
+                    
+                    # Then mark rows with all important fields filled as tagged, writing the
+                    # categorical codes directly instead of going through the .loc indexer
+                    required = [col for col in tag_fields if col in edited_data.columns]
+                    complete = np.logical_and.reduce([edited_data[col].notna().to_numpy() for col in required])
+                    rows = df_edited.index.get_indexer(edited_data.index)
+                    tagged_codes = df_edited['Tagged'].cat.codes.to_numpy().copy()
+                    yes_code = df_edited['Tagged'].cat.categories.get_loc('Yes')
+                    newly_tagged = rows[complete & (tagged_codes[rows] != yes_code)]
+                    tagged_codes[newly_tagged] = yes_code
+                    df_edited['Tagged'] = pd.Categorical.from_codes(tagged_codes, dtype=df_edited['Tagged'].dtype)
+                    changes_made = len(newly_tagged)
+                    st.session_state.edit_version += 1
                     
                     if changes_made > 0:
                         st.success(f"✅ {changes_made} resource(s) updated successfully! Resources with complete tags have been marked as 'Tagged'.")
@@ -716,32 +1014,39 @@ if uploaded_file is not None:
             st.subheader("Task 5.3: Download the Remediated Dataset")
             st.info("💡 Hint: Use st.download_button")
             
+            # The remediated frame changes with every Apply, so its bytes are keyed on the edit version
+            remediated_key = ('remediated', uploaded_file.file_id, st.session_state.edit_version)
+            
             col1, col2 = st.columns(2)
             
             with col1:
-                csv_buffer = BytesIO()
-                st.session_state.df_edited.to_csv(csv_buffer, index=False)
-                csv_buffer.seek(0)
-                
                 st.download_button(
                     label="📥 Download Remediated Dataset",
-                    data=csv_buffer,
+                    data=to_csv_bytes(st.session_state.df_edited, remediated_key),
                     file_name="cloudmart_remediated.csv",
                     mime="text/csv"
                 )
+                st.download_button(
+                    label="📥 Download Remediated Dataset (Parquet)",
+                    data=to_parquet_bytes(st.session_state.df_edited, remediated_key),
+                    file_name="cloudmart_remediated.parquet",
+                    mime="application/vnd.apache.parquet"
+                )
             
             with col2:
                 # Original dataset download
-                csv_buffer_original = BytesIO()
-                st.session_state.original_df.to_csv(csv_buffer_original, index=False)
-                csv_buffer_original.seek(0)
-                
                 st.download_button(
                     label="📥 Download Original Dataset",
-                    data=csv_buffer_original,
+                    data=to_csv_bytes(st.session_state.original_df, ('original', uploaded_file.file_id)),
                     file_name="cloudmart_original.csv",
                     mime="text/csv"
                 )
+                st.download_button(
+                    label="📥 Download Original Dataset (Parquet)",
+                    data=to_parquet_bytes(st.session_state.original_df, ('original', uploaded_file.file_id)),
+                    file_name="cloudmart_original.parquet",
+                    mime="application/vnd.apache.parquet"
+                )
             
             st.markdown("---")
             
@@ -749,26 +1054,29 @@ if uploaded_file is not None:
             st.subheader("Task 5.4: Compare Before and After Remediation")
             st.info("💡 Hint: Recalculate tagging metrics after updates")
             
+            # One groupby on the edited frame; counts and costs per Tagged value are read off the summaries
+            after_summary = tagging_summary(st.session_state.df_edited)
+            before_tagged_count = before_stats['tagged_count']
+            after_tagged_count = after_summary['size'].sum()
+            
             col1, col2 = st.columns(2)
             
             with col1:
                 st.markdown("#### 📊 Before Remediation")
-                before_tagged = st.session_state.original_df['Tagged'].value_counts()
-                before_untagged = before_tagged.get('No', 0)
-                before_total = len(st.session_state.original_df)
+                before_untagged = before_tagged_count.get('No', 0)
+                before_total = before_stats['total']
                 before_pct = (before_untagged / before_total) * 100
-                before_cost = st.session_state.original_df[st.session_state.original_df['Tagged'] == 'No']['MonthlyCostUSD'].sum()
+                before_cost = before_stats['untagged_cost']
                 
                 st.metric("Untagged Resources", f"{before_untagged} ({before_pct:.2f}%)")
                 st.metric("Untagged Cost", f"${before_cost:,.2f}")
             
             with col2:
                 st.markdown("#### ✅ After Remediation")
-                after_tagged = st.session_state.df_edited['Tagged'].value_counts()
-                after_untagged = after_tagged.get('No', 0)
+                after_untagged = after_tagged_count.get('No', 0)
                 after_total = len(st.session_state.df_edited)
                 after_pct = (after_untagged / after_total) * 100
-                after_cost = st.session_state.df_edited[st.session_state.df_edited['Tagged'] == 'No']['MonthlyCostUSD'].sum()
+                after_cost = after_summary['sum'].sum().get('No', 0)
                 
                 improvement = before_untagged - after_untagged
                 cost_improvement = before_cost - after_cost
@@ -782,23 +1090,13 @@ if uploaded_file is not None:
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = go.Figure()
-                fig.add_trace(go.Bar(name='Before', x=['Untagged Resources'], 
-                                     y=[before_untagged], marker_color='#dc3545'))
-                fig.add_trace(go.Bar(name='After', x=['Untagged Resources'], 
-                                     y=[after_untagged], marker_color='#28a745'))
-                fig.update_layout(title='Remediation Impact on Untagged Resources', 
-                                 yaxis_title='Count', barmode='group')
+                fig = impact_bar_figure('Untagged Resources', before_untagged, after_untagged,
+                                        'Remediation Impact on Untagged Resources', 'Count')
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                fig = go.Figure()
-                fig.add_trace(go.Bar(name='Before', x=['Untagged Cost'], 
-                                     y=[before_cost], marker_color='#dc3545'))
-                fig.add_trace(go.Bar(name='After', x=['Untagged Cost'], 
-                                     y=[after_cost], marker_color='#28a745'))
-                fig.update_layout(title='Remediation Impact on Untagged Cost', 
-                                 yaxis_title='Cost (USD)', barmode='group')
+                fig = impact_bar_figure('Untagged Cost', before_cost, after_cost,
+                                        'Remediation Impact on Untagged Cost', 'Cost (USD)')
                 st.plotly_chart(fig, use_container_width=True)
             
             st.markdown("---")
@@ -807,281 +1105,217 @@ if uploaded_file is not None:
             st.subheader("Task 5.5: Impact Analysis - How Improved Tagging Affects Accountability")
             st.info("💡 Hint: Analyze the data and discuss accountability improvements")
             
-            # Calculate key metrics
-            before_tagged_count = st.session_state.original_df['Tagged'].value_counts()
-            after_tagged_count = st.session_state.df_edited['Tagged'].value_counts()
-            
-            before_untagged = before_tagged_count.get('No', 0)
-            after_untagged = after_tagged_count.get('No', 0)
+            # Calculate key metrics (untagged counts and costs come from the Task 5.4 summaries)
             remediated_count = before_untagged - after_untagged
-            remediation_rate = (remediated_count / before_untagged * 100) if before_untagged > 0 else 0
-            
-            before_cost = st.session_state.original_df[st.session_state.original_df['Tagged'] == 'No']['MonthlyCostUSD'].sum()
-            after_cost = st.session_state.df_edited[st.session_state.df_edited['Tagged'] == 'No']['MonthlyCostUSD'].sum()
-            cost_recovered = before_cost - after_cost
-            
-            # Key Metrics Dashboard
-            st.markdown("### 📊 Remediation Impact Summary")
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric("Resources Remediated", f"{remediated_count}", 
-                         delta=f"{remediation_rate:.1f}% of untagged")
-            with col2:
-                st.metric("Cost Visibility Gained", f"${cost_recovered:,.2f}",
-                         delta="Now trackable")
-            with col3:
-                completion_rate = ((len(st.session_state.df_edited) - after_untagged) / len(st.session_state.df_edited) * 100)
-                st.metric("Overall Compliance", f"{completion_rate:.1f}%",
-                         delta=f"+{remediation_rate:.1f}%")
-            with col4:
-                avg_tags_before = st.session_state.original_df[['Department', 'Project', 'Owner']].notna().sum().sum() / (len(st.session_state.original_df) * 3) * 100
-                avg_tags_after = st.session_state.df_edited[['Department', 'Project', 'Owner']].notna().sum().sum() / (len(st.session_state.df_edited) * 3) * 100
-                st.metric("Tag Completeness", f"{avg_tags_after:.1f}%",
-                         delta=f"+{avg_tags_after - avg_tags_before:.1f}%")
-            
-            st.markdown("---")
-            
-            # Visualization 1: Tag Completeness Improvement by Field
-            st.markdown("### 🎯 Tag Completeness Improvement by Field")
-            
-            tag_fields = ['Department', 'Project', 'Owner']
-            before_completeness = []
-            after_completeness = []
             
-            for field in tag_fields:
-                if field in st.session_state.original_df.columns:
-                    before_pct = (st.session_state.original_df[field].notna().sum() / len(st.session_state.original_df)) * 100
-                    after_pct = (st.session_state.df_edited[field].notna().sum() / len(st.session_state.df_edited)) * 100
-                    before_completeness.append(before_pct)
-                    after_completeness.append(after_pct)
-            
-            completeness_df = pd.DataFrame({
-                'Tag Field': tag_fields * 2,
-                'Completeness %': before_completeness + after_completeness,
-                'Status': ['Before'] * len(tag_fields) + ['After'] * len(tag_fields)
-            })
-            
-            fig = px.bar(completeness_df, x='Tag Field', y='Completeness %',
-                        color='Status', barmode='group',
-                        title='Tag Field Completeness: Before vs After Remediation',
-                        color_discrete_map={'Before': '#dc3545', 'After': '#28a745'},
-                        text='Completeness %')
-            fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-            fig.update_layout(yaxis_range=[0, 110])
-            st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("---")
-            
-            # Visualization 2: Cost Accountability by Department
-            st.markdown("### 💰 Cost Accountability Impact by Department")
-            
-            if 'Department' in st.session_state.df_edited.columns:
-                # Calculate before/after costs by department
-                before_dept_costs = st.session_state.original_df.groupby('Department')['MonthlyCostUSD'].sum().reset_index()
-                before_dept_costs.columns = ['Department', 'Total Cost']
+            # Nothing to analyse until at least one resource has been remediated
+            if remediated_count > 0:
+                remediation_rate = (remediated_count / before_untagged * 100) if before_untagged > 0 else 0
                 
-                # Calculate untagged costs
-                before_untagged_dept = st.session_state.original_df[st.session_state.original_df['Tagged'] == 'No'].groupby('Department')['MonthlyCostUSD'].sum().reset_index()
-                before_untagged_dept.columns = ['Department', 'Untagged Cost Before']
+                cost_recovered = before_cost - after_cost
                 
-                after_untagged_dept = st.session_state.df_edited[st.session_state.df_edited['Tagged'] == 'No'].groupby('Department')['MonthlyCostUSD'].sum().reset_index()
-                after_untagged_dept.columns = ['Department', 'Untagged Cost After']
+                # One null scan of the edited frame over the tag fields, reused for overall and per-field completeness
+                before_notna = before_stats['notna']
+                after_notna = st.session_state.df_edited[tag_fields].notna().sum()
                 
-                # Merge
-                dept_comparison = before_dept_costs.merge(before_untagged_dept, on='Department', how='left').merge(after_untagged_dept, on='Department', how='left')
-                dept_comparison['Untagged Cost Before'] = dept_comparison['Untagged Cost Before'].fillna(0)
-                dept_comparison['Untagged Cost After'] = dept_comparison['Untagged Cost After'].fillna(0)
-                dept_comparison['Cost Now Trackable'] = dept_comparison['Untagged Cost Before'] - dept_comparison['Untagged Cost After']
-                dept_comparison['Accountability %'] = (dept_comparison['Cost Now Trackable'] / dept_comparison['Total Cost'] * 100).round(1)
+                # Key Metrics Dashboard
+                st.markdown("### 📊 Remediation Impact Summary")
                 
-                # Create visualization
-                fig = px.bar(dept_comparison, x='Department', y='Cost Now Trackable',
-                            title='Cost Visibility Gained by Department',
-                            color='Accountability %',
-                            color_continuous_scale='Greens',
-                            text='Cost Now Trackable')
-                fig.update_traces(texttemplate='$%{text:,.0f}', textposition='outside')
-                st.plotly_chart(fig, use_container_width=True)
+                col1, col2, col3, col4 = st.columns(4)
                 
-                # Show department accountability table
-                dept_display = dept_comparison[['Department', 'Total Cost', 'Cost Now Trackable', 'Accountability %']].sort_values('Cost Now Trackable', ascending=False)
-                dept_display['Total Cost'] = dept_display['Total Cost'].apply(lambda x: f'${x:,.2f}')
-                dept_display['Cost Now Trackable'] = dept_display['Cost Now Trackable'].apply(lambda x: f'${x:,.2f}')
-                dept_display['Accountability %'] = dept_display['Accountability %'].apply(lambda x: f'{x:.1f}%')
+                with col1:
+                    st.metric("Resources Remediated", f"{remediated_count}", 
+                             delta=f"{remediation_rate:.1f}% of untagged")
+                with col2:
+                    st.metric("Cost Visibility Gained", f"${cost_recovered:,.2f}",
+                             delta="Now trackable")
+                with col3:
+                    completion_rate = ((len(st.session_state.df_edited) - after_untagged) / len(st.session_state.df_edited) * 100)
+                    st.metric("Overall Compliance", f"{completion_rate:.1f}%",
+                             delta=f"+{remediation_rate:.1f}%")
+                with col4:
+                    avg_tags_before = before_notna.sum() / (before_stats['total'] * max(len(tag_fields), 1)) * 100
+                    avg_tags_after = after_notna.sum() / (len(st.session_state.df_edited) * max(len(tag_fields), 1)) * 100
+                    st.metric("Tag Completeness", f"{avg_tags_after:.1f}%",
+                             delta=f"+{avg_tags_after - avg_tags_before:.1f}%")
                 
-                st.dataframe(dept_display, use_container_width=True)
-            
-            st.markdown("---")
-            
-            # Visualization 3: Tagging Progress Timeline
-            st.markdown("### 📈 Tagging Compliance Progress")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Pie chart comparison
-                progress_data = pd.DataFrame({
-                    'Status': ['Tagged', 'Untagged', 'Tagged', 'Untagged'],
-                    'Count': [
-                        before_tagged_count.get('Yes', 0),
-                        before_tagged_count.get('No', 0),
-                        after_tagged_count.get('Yes', 0),
-                        after_tagged_count.get('No', 0)
-                    ],
-                    'Period': ['Before', 'Before', 'After', 'After']
+                st.markdown("---")
+                
+                # Visualization 1: Tag Completeness Improvement by Field
+                st.markdown("### 🎯 Tag Completeness Improvement by Field")
+                
+                # Before and after percentages side by side, straight from the non-null counts
+                completeness_df = pd.DataFrame({
+                    'Tag Field': tag_fields * 2,
+                    'Completeness %': np.concatenate([before_notna.to_numpy() / before_stats['total'],
+                                                      after_notna.to_numpy() / len(st.session_state.df_edited)]) * 100,
+                    'Status': np.repeat(['Before', 'After'], len(tag_fields))
                 })
                 
-                fig = px.pie(progress_data[progress_data['Period'] == 'Before'], 
-                            values='Count', names='Status',
-                            title='Before Remediation',
-                            color='Status',
-                            color_discrete_map={'Tagged': '#28a745', 'Untagged': '#dc3545'},
-                            hole=0.4)
-                fig.update_traces(textposition='inside', textinfo='percent+label')
+                fig = px.bar(completeness_df, x='Tag Field', y='Completeness %',
+                            color='Status', barmode='group',
+                            title='Tag Field Completeness: Before vs After Remediation',
+                            color_discrete_map={'Before': '#dc3545', 'After': '#28a745'},
+                            text='Completeness %')
+                fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+                fig.update_layout(yaxis_range=[0, 110])
                 st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                fig = px.pie(progress_data[progress_data['Period'] == 'After'], 
-                            values='Count', names='Status',
-                            title='After Remediation',
-                            color='Status',
-                            color_discrete_map={'Tagged': '#28a745', 'Untagged': '#dc3545'},
-                            hole=0.4)
-                fig.update_traces(textposition='inside', textinfo='percent+label')
+                
+                st.markdown("---")
+                
+                # Visualization 2: Cost Accountability by Department
+                st.markdown("### 💰 Cost Accountability Impact by Department")
+                
+                if 'Department' in st.session_state.df_edited.columns:
+                    # Calculate before/after costs by department straight from the tagging summaries
+                    # (total = all Tagged values, untagged = the 'No' column); no extra groupbys or merges
+                    before_dept = before_stats['summary']['sum']
+                    before_dept = before_dept[before_dept.index.notna()]
+                    no_untagged = pd.Series(0.0, index=before_dept.index)
+                    dept_comparison = pd.DataFrame({
+                        'Total Cost': before_dept.sum(axis=1),
+                        'Untagged Cost Before': before_dept.get('No', no_untagged),
+                        'Untagged Cost After': after_summary['sum'].get('No', no_untagged).reindex(before_dept.index, fill_value=0)
+                    }).reset_index()
+                    dept_comparison['Cost Now Trackable'] = dept_comparison['Untagged Cost Before'] - dept_comparison['Untagged Cost After']
+                    dept_comparison['Accountability %'] = (dept_comparison['Cost Now Trackable'] / dept_comparison['Total Cost'] * 100).round(1)
+                    
+                    # Create visualization
+                    fig = px.bar(dept_comparison, x='Department', y='Cost Now Trackable',
+                                title='Cost Visibility Gained by Department',
+                                color='Accountability %',
+                                color_continuous_scale='Greens',
+                                text='Cost Now Trackable')
+                    fig.update_traces(texttemplate='$%{text:,.0f}', textposition='outside')
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                    # Show department accountability table
+                    dept_display = dept_comparison[['Department', 'Total Cost', 'Cost Now Trackable', 'Accountability %']].sort_values('Cost Now Trackable', ascending=False)
+                    
+                    # Format at render time with a Styler instead of rewriting the columns as strings
+                    st.dataframe(dept_display.style.format({'Total Cost': '${:,.2f}',
+                                                            'Cost Now Trackable': '${:,.2f}',
+                                                            'Accountability %': '{:.1f}%'}),
+                                 use_container_width=True)
+                
+                st.markdown("---")
+                
+                # Visualization 3: Tagging Progress Timeline
+                st.markdown("### 📈 Tagging Compliance Progress")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Pie chart comparison
+                    fig = progress_pie_figure('Before Remediation',
+                                              before_tagged_count.get('Yes', 0), before_tagged_count.get('No', 0))
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                with col2:
+                    fig = progress_pie_figure('After Remediation',
+                                              after_tagged_count.get('Yes', 0), after_tagged_count.get('No', 0))
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                st.markdown("---")
+                
+                # Key Insights with Icons
+                st.markdown("### 🎯 Key Accountability Improvements")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("""
+                    #### 📋 **Cost Visibility Benefits**
+                    
+                    **Before Remediation:**
+                    - 🔴 ${:,.2f} in untracked cloud spending
+                    - 🔴 {:} resources without clear ownership
+                    - 🔴 No departmental cost attribution
+                    
+                    **After Remediation:**
+                    - 🟢 ${:,.2f} now properly attributed
+                    - 🟢 {:} resources with clear owners
+                    - 🟢 Improved budget accountability by {:.1f}%
+                    """.format(
+                        before_cost,
+                        before_untagged,
+                        cost_recovered,
+                        remediated_count,
+                        (cost_recovered / before_cost * 100) if before_cost > 0 else 0
+                    ))
+                
+                with col2:
+                    st.markdown("""
+                    #### 🏢 **Governance Impact**
+                    
+                    **Organizational Benefits:**
+                    - ✅ Clear resource ownership established
+                    - ✅ Department-level cost tracking enabled
+                    - ✅ Compliance with tagging policies improved
+                    - ✅ Better resource lifecycle management
+                    
+                    **Financial Control:**
+                    - ✅ Accurate showback/chargeback reports
+                    - ✅ Budget variance tracking by department
+                    - ✅ Cost anomaly detection enabled
+                    - ✅ Forecasting accuracy improved
+                    """)
+                
+                st.markdown("---")
+                
+                # Actionable Recommendations
+                st.markdown("### 🚀 Recommended Next Steps")
+                
+                # Calculate specific recommendations based on data
+                remaining_untagged = after_untagged
+                remaining_cost = after_cost
+                
+                if remaining_untagged > 0:
+                    st.warning(f"""
+                    **⚠️ Action Required:** {remaining_untagged} resources (${remaining_cost:,.2f}) still remain untagged.
+                    
+                    **Priority Actions:**
+                    1. 🎯 Focus on high-cost resources first (RDS, EC2 instances)
+                    2. 📧 Contact resource creators to identify ownership
+                    3. 🔍 Review resources older than 90 days without tags
+                    4. 🗑️ Consider decommissioning orphaned resources
+                    """)
+                else:
+                    st.success("🎉 **Excellent!** All resources are now properly tagged!")
+                
+                # Best Practices Visualization
+                st.markdown("### 📚 Best Practices for Sustained Compliance")
+                
+                fig = best_practices_figure()
                 st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("---")
-            
-            # Key Insights with Icons
-            st.markdown("### 🎯 Key Accountability Improvements")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("""
-                #### 📋 **Cost Visibility Benefits**
                 
-                **Before Remediation:**
-                - 🔴 ${:,.2f} in untracked cloud spending
-                - 🔴 {:} resources without clear ownership
-                - 🔴 No departmental cost attribution
+                # ROI Calculation
+                st.markdown("### 💵 Estimated ROI of Tag Remediation")
                 
-                **After Remediation:**
-                - 🟢 ${:,.2f} now properly attributed
-                - 🟢 {:} resources with clear owners
-                - 🟢 Improved budget accountability by {:.1f}%
-                """.format(
-                    before_cost,
-                    before_untagged,
-                    cost_recovered,
-                    remediated_count,
-                    (cost_recovered / before_cost * 100) if before_cost > 0 else 0
-                ))
-            
-            with col2:
-                st.markdown("""
-                #### 🏢 **Governance Impact**
+                # Calculate potential savings
+                monthly_savings = cost_recovered * 0.15  # Assume 15% optimization from visibility
+                annual_savings = monthly_savings * 12
+                remediation_hours = remediated_count * 0.25  # 15 min per resource
+                remediation_cost = remediation_hours * 50  # $50/hour average
                 
-                **Organizational Benefits:**
-                - ✅ Clear resource ownership established
-                - ✅ Department-level cost tracking enabled
-                - ✅ Compliance with tagging policies improved
-                - ✅ Better resource lifecycle management
+                col1, col2, col3 = st.columns(3)
                 
-                **Financial Control:**
-                - ✅ Accurate showback/chargeback reports
-                - ✅ Budget variance tracking by department
-                - ✅ Cost anomaly detection enabled
-                - ✅ Forecasting accuracy improved
-                """)
-            
-            st.markdown("---")
-            
-            # Actionable Recommendations
-            st.markdown("### 🚀 Recommended Next Steps")
-            
-            # Calculate specific recommendations based on data
-            remaining_untagged = after_untagged
-            remaining_cost = after_cost
-            
-            if remaining_untagged > 0:
-                st.warning(f"""
-                **⚠️ Action Required:** {remaining_untagged} resources (${remaining_cost:,.2f}) still remain untagged.
+                with col1:
+                    st.metric("One-time Cost", f"${remediation_cost:,.0f}",
+                             delta="Remediation effort")
+                with col2:
+                    st.metric("Monthly Savings", f"${monthly_savings:,.0f}",
+                             delta="15% optimization")
+                with col3:
+                    roi_months = remediation_cost / monthly_savings if monthly_savings > 0 else 0
+                    st.metric("Break-even Period", f"{roi_months:.1f} months",
+                             delta=f"${annual_savings:,.0f}/year")
                 
-                **Priority Actions:**
-                1. 🎯 Focus on high-cost resources first (RDS, EC2 instances)
-                2. 📧 Contact resource creators to identify ownership
-                3. 🔍 Review resources older than 90 days without tags
-                4. 🗑️ Consider decommissioning orphaned resources
-                """)
+                # ROI visualization
+                fig = roi_figure(monthly_savings, remediation_cost)
+                st.plotly_chart(fig, use_container_width=True)
             else:
-                st.success("🎉 **Excellent!** All resources are now properly tagged!")
-            
-            # Best Practices Visualization
-            st.markdown("### 📚 Best Practices for Sustained Compliance")
-            
-            best_practices = pd.DataFrame({
-                'Practice': [
-                    'Automated Tagging',
-                    'Tag Policies',
-                    'Regular Audits',
-                    'Owner Training',
-                    'CI/CD Integration'
-                ],
-                'Impact': [95, 90, 85, 80, 92],
-                'Effort': [60, 40, 30, 20, 70],
-                'Category': ['Automation', 'Policy', 'Process', 'People', 'Automation']
-            })
-            
-            fig = px.scatter(best_practices, x='Effort', y='Impact', size='Impact',
-                            color='Category', text='Practice',
-                            title='Best Practices: Impact vs Implementation Effort',
-                            labels={'Impact': 'Effectiveness (%)', 'Effort': 'Implementation Effort (%)'},
-                            color_discrete_sequence=px.colors.qualitative.Set2)
-            fig.update_traces(textposition='top center')
-            fig.update_layout(showlegend=True)
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # ROI Calculation
-            st.markdown("### 💵 Estimated ROI of Tag Remediation")
-            
-            # Calculate potential savings
-            monthly_savings = cost_recovered * 0.15  # Assume 15% optimization from visibility
-            annual_savings = monthly_savings * 12
-            remediation_hours = remediated_count * 0.25  # 15 min per resource
-            remediation_cost = remediation_hours * 50  # $50/hour average
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("One-time Cost", f"${remediation_cost:,.0f}",
-                         delta="Remediation effort")
-            with col2:
-                st.metric("Monthly Savings", f"${monthly_savings:,.0f}",
-                         delta="15% optimization")
-            with col3:
-                roi_months = remediation_cost / monthly_savings if monthly_savings > 0 else 0
-                st.metric("Break-even Period", f"{roi_months:.1f} months",
-                         delta=f"${annual_savings:,.0f}/year")
-            
-            # ROI visualization
-            months = list(range(0, 13))
-            cumulative_savings = [monthly_savings * m - remediation_cost for m in months]
-            
-            roi_df = pd.DataFrame({
-                'Month': months,
-                'Net Benefit': cumulative_savings
-            })
-            
-            fig = px.line(roi_df, x='Month', y='Net Benefit',
-                         title='Cumulative ROI from Tag Remediation',
-                         markers=True)
-            fig.add_hline(y=0, line_dash="dash", line_color="red", 
-                         annotation_text="Break-even")
-            fig.update_layout(yaxis_title='Cumulative Net Benefit ($)')
-            st.plotly_chart(fig, use_container_width=True)
+                st.info("Apply at least one remediation in Task 5.2 to see the impact analysis.")
 
         
         # Footer